@@ -1,4 +1,4 @@
-from . import server
+from . import ratelimit, server
 
 __version__ = "1.0.1"
-__all__ = ["__version__", "server"]
+__all__ = ["__version__", "ratelimit", "server"]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+__all__ = ["TokenBucketLimiter"]
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable, Hashable
+
+# (rate in tokens per second, burst capacity)
+Limit = Tuple[float, float]
+
+
+def _check_limit(limit: Limit) -> None:
+    rate, burst = limit
+    if rate < 0:
+        msg = f"Rate must not be negative (got {rate})"
+        raise ValueError(msg)
+    if burst < 1:
+        msg = f"Burst must be at least 1 (got {burst})"
+        raise ValueError(msg)
+
+
+class TokenBucketLimiter:
+    """Token bucket rate limiter keyed by caller context and method name.
+
+    Every call consumes one token from the caller's bucket, sized by ``clients``
+    (or the default ``rate``/``burst``), and, for methods listed in ``methods``,
+    one token from the caller's bucket dedicated to that method. A call is
+    rejected if any of those buckets is empty. The context passed to
+    ``JsonRpcServer.call()`` is the client key unless ``key`` maps it to one.
+
+    Buckets untouched for ``idle_timeout`` seconds, and refilled by then, are
+    evicted, so the state stays proportional to the number of active clients.
+    A rate of 0 makes ``burst`` a fixed quota whose buckets are never evicted
+    once used.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        rate: float,
+        burst: float | None = None,
+        *,
+        methods: dict[str, Limit] | None = None,
+        clients: dict[Hashable, Limit] | None = None,
+        key: Callable[[Any], Hashable] | None = None,
+        idle_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if idle_timeout < 0:
+            msg = f"'idle_timeout' must not be negative (got {idle_timeout})"
+            raise ValueError(msg)
+        self._default: Limit = (rate, rate if burst is None else burst)
+        self._methods = methods or {}
+        self._clients = clients or {}
+        for limit in (self._default, *self._methods.values(), *self._clients.values()):
+            _check_limit(limit)
+        self._key = key
+        self._idle_timeout = idle_timeout
+        self._clock = clock
+        # bucket key -> [tokens, last update, eviction time]
+        self._buckets: dict[tuple[Hashable, str | None], list[float]] = {}
+        # Heap of (eviction time, tie breaker, bucket key), possibly outdated
+        self._expiry: list[tuple[float, int, tuple[Hashable, str | None]]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _refill(
+        self, bucket_key: tuple[Hashable, str | None], limit: Limit, now: float
+    ) -> list[float]:
+        rate, burst = limit
+        try:
+            bucket = self._buckets[bucket_key]
+        except KeyError:
+            bucket = self._buckets[bucket_key] = [burst, now, now]
+        else:
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        return bucket
+
+    def _expire(
+        self,
+        bucket_key: tuple[Hashable, str | None],
+        bucket: list[float],
+        limit: Limit,
+        now: float,
+    ) -> None:
+        # A bucket may only be dropped once it has refilled, otherwise it would
+        # be recreated full and the client could bypass its limit.
+        rate, burst = limit
+        missing = burst - bucket[0]
+        refill_time = 0.0 if missing <= 0 else missing / rate if rate else math.inf
+        bucket[2] = now + max(self._idle_timeout, refill_time)
+        if bucket[2] < math.inf:
+            heapq.heappush(self._expiry, (bucket[2], next(self._counter), bucket_key))
+
+    def _evict(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, _, bucket_key = heapq.heappop(self._expiry)
+            bucket = self._buckets.get(bucket_key)
+            # Entries are not removed when a bucket gets a later eviction time
+            if bucket is not None and bucket[2] <= now:
+                del self._buckets[bucket_key]
+        # Drop outdated entries so that the heap stays proportional to the buckets
+        if len(self._expiry) > 2 * len(self._buckets) + 64:
+            self._expiry = [
+                (bucket[2], next(self._counter), bucket_key)
+                for bucket_key, bucket in self._buckets.items()
+                if bucket[2] < math.inf
+            ]
+            heapq.heapify(self._expiry)
+
+    def acquire(self, method: str, context: Any = None) -> bool:
+        client = context if self._key is None else self._key(context)
+        with self._lock:
+            now = self._clock()
+            self._evict(now)
+            limits: list[tuple[tuple[Hashable, str | None], Limit]] = [
+                ((client, None), self._clients.get(client, self._default))
+            ]
+            if method in self._methods:
+                limits.append(((client, method), self._methods[method]))
+            buckets = [self._refill(key, limit, now) for key, limit in limits]
+            allowed = all(bucket[0] >= 1 for bucket in buckets)
+            for bucket, (bucket_key, limit) in zip(buckets, limits):
+                if allowed:
+                    bucket[0] -= 1
+                self._expire(bucket_key, bucket, limit, now)
+            return allowed
@@ -0,0 +1,339 @@
+"""Replay a recorded JSON-RPC traffic corpus against a server and report metrics.
+
+Usage: ``python -m pyjsonrpc2.replay corpus.jsonl [--rate N] [--processes N] ...``
+"""
+
+from __future__ import annotations
+
+__all__ = ["ReplayReport", "load_corpus", "main", "replay", "stub_server"]
+
+import argparse
+import importlib
+import math
+import multiprocessing
+import threading
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from orjson import loads
+
+from .server import JsonRpcServer
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable, Iterable, Sequence
+    from os import PathLike
+
+    T = TypeVar("T", int, float)
+
+_OK = "ok"
+# Responses are classified in chunks, while the replay clock is paused. The
+# chunk buffer (a few KiB per response) is included in the reported peak memory.
+_CHUNK_SIZE = 64
+# Set in pool workers so that replay loops start together once setup is done
+_start_barrier: Any = None
+
+
+@dataclass
+class ReplayReport:
+    calls: int = 0
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list, repr=False)
+    outcomes: Counter[int | str] = field(default_factory=Counter)
+    memory_growth: int | None = None
+    memory_peak: int | None = None
+    # Wall clock start of the replay loop and start + elapsed, comparable
+    # across processes
+    started: float = 0.0
+    finished: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.calls / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        # Nearest-rank method
+        return ordered[max(0, math.ceil(len(ordered) * p / 100) - 1)]
+
+    def merge(self, other: ReplayReport) -> None:
+        self.calls += other.calls
+        self.latencies += other.latencies
+        self.outcomes += other.outcomes
+        if other.memory_growth is not None:
+            self.memory_growth = (self.memory_growth or 0) + other.memory_growth
+            self.memory_peak = max(self.memory_peak or 0, other.memory_peak or 0)
+
+    def __str__(self) -> str:
+        lines = [
+            f"calls:       {self.calls}",
+            f"elapsed:     {self.elapsed:.3f} s",
+            f"throughput:  {self.throughput:.1f} calls/s",
+            "latency (ms): "
+            + " ".join(
+                f"p{p}={self.percentile(p) * 1e3:.3f}" for p in (50, 90, 99, 100)
+            ),
+            "outcomes:    "
+            + ", ".join(f"{k}={v}" for k, v in sorted(self.outcomes.items(), key=str)),
+        ]
+        if self.memory_growth is not None:
+            lines.append(
+                f"memory:      growth={self.memory_growth / 1024:.1f} KiB peak={(self.memory_peak or 0) / 1024:.1f} KiB"
+            )
+        return "\n".join(lines)
+
+
+def load_corpus(path: str | PathLike[str]) -> list[bytes]:
+    with open(path, "rb") as f:  # noqa: PTH123
+        return [line for line in (raw.strip() for raw in f) if line]
+
+
+def _method_names(corpus: Iterable[bytes]) -> set[str]:
+    names = set()
+    for raw in corpus:
+        try:
+            request = loads(raw)
+        except ValueError:
+            continue
+        for r in request if isinstance(request, list) else (request,):
+            if isinstance(r, dict) and isinstance(r.get("method"), str):
+                names.add(r["method"])
+    return names
+
+
+def _stub(*_args: Any, **_kwargs: Any) -> None:
+    return None
+
+
+def stub_server(corpus: Iterable[bytes]) -> JsonRpcServer:
+    """Build a server with a no-op method for every method name in the corpus."""
+    return JsonRpcServer(dict.fromkeys(_method_names(corpus), _stub))
+
+
+def _parse_server_spec(spec: str) -> tuple[str, str]:
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        msg = f"Invalid server spec '{spec}' (expected 'module:attribute')"
+        raise ValueError(msg)
+    return module_name, attr
+
+
+def _load_server(spec: str) -> JsonRpcServer:
+    module_name, attr = _parse_server_spec(spec)
+    obj = getattr(importlib.import_module(module_name), attr)
+    if not isinstance(obj, JsonRpcServer) and callable(obj):
+        obj = obj()
+    if not isinstance(obj, JsonRpcServer):
+        msg = f"'{spec}' is neither a JsonRpcServer nor a factory returning one (got {type(obj)})"
+        raise TypeError(msg)
+    return obj
+
+
+def _record(outcomes: Counter[int | str], responses: list[bytes | None]) -> None:
+    for i, response in enumerate(responses):
+        if response is None:  # Notification(s)
+            continue
+        responses[i] = None
+        decoded = loads(response)
+        for r in decoded if isinstance(decoded, list) else (decoded,):
+            outcomes[r["error"]["code"] if "error" in r else _OK] += 1
+
+
+def _worker_server(corpus: Sequence[bytes], server_spec: str | None) -> JsonRpcServer:
+    try:
+        return stub_server(corpus) if server_spec is None else _load_server(server_spec)
+    except BaseException:
+        if _start_barrier is not None:
+            _start_barrier.abort()  # Do not leave the other workers waiting
+        raise
+
+
+def _wait_for_workers() -> None:
+    if _start_barrier is None:
+        return
+    try:
+        _start_barrier.wait()
+    except threading.BrokenBarrierError:
+        msg = "Another replay worker failed to set up its server"
+        raise RuntimeError(msg) from None
+
+
+def _worker(
+    corpus: Sequence[bytes],
+    server_spec: str | None,
+    rate: float | None,
+    repeat: int,
+    trace_memory: bool,  # noqa: FBT001
+) -> ReplayReport:
+    server = _worker_server(corpus, server_spec)
+    report = ReplayReport()
+    # Preallocated so that bookkeeping does not show up as memory growth
+    calls = [raw for _ in range(repeat) for raw in corpus]
+    latencies = array("d", bytes(8 * len(calls)))
+    responses: list[bytes | None] = [None] * _CHUNK_SIZE
+    if trace_memory:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+    _wait_for_workers()
+    clock = time.perf_counter
+    report.started = time.time()
+    paused = 0.0
+    start = clock()
+    for i, raw in enumerate(calls):
+        if rate:
+            scheduled = start + paused + i / rate
+            delay = scheduled - clock()
+            if delay > 0:
+                time.sleep(delay)
+            # Measure from the scheduled send time so that a slow call delaying
+            # the following ones shows up in their latency too.
+            began = scheduled
+        else:
+            began = clock()
+        responses[i % _CHUNK_SIZE] = server.call(raw)
+        latencies[i] = clock() - began
+        if i % _CHUNK_SIZE == _CHUNK_SIZE - 1:
+            # Decoding responses is client work: keep it out of the timings.
+            # Only a chunk is kept, as orjson output buffers would otherwise
+            # dwarf any memory growth of the server itself.
+            paused_at = clock()
+            _record(report.outcomes, responses)
+            paused += clock() - paused_at
+    report.elapsed = clock() - start - paused
+    report.finished = report.started + report.elapsed
+    _record(report.outcomes, responses)
+    if trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report.memory_growth = current - baseline
+        report.memory_peak = peak - baseline
+    report.calls = len(calls)
+    report.latencies = latencies.tolist()
+    return report
+
+
+def _init_worker(barrier: Any) -> None:
+    global _start_barrier  # noqa: PLW0603
+    _start_barrier = barrier
+
+
+def replay(  # noqa: PLR0913
+    corpus: Sequence[bytes],
+    *,
+    server_spec: str | None = None,
+    rate: float | None = None,
+    processes: int = 1,
+    repeat: int = 1,
+    trace_memory: bool = False,
+) -> ReplayReport:
+    """Replay ``corpus`` and return the aggregated report.
+
+    ``server_spec`` is a ``module:attribute`` path to a ``JsonRpcServer``
+    instance or factory; a stub server is used when omitted. ``rate`` is the
+    total number of calls per second, shared between processes; ``None``
+    replays as fast as possible.
+    """
+    if processes < 1 or repeat < 1:
+        msg = "'processes' and 'repeat' must be at least 1"
+        raise ValueError(msg)
+    if rate is not None and rate <= 0:
+        msg = "'rate' must be positive"
+        raise ValueError(msg)
+    if server_spec is not None:
+        _parse_server_spec(server_spec)
+    per_process_rate = rate / processes if rate else None
+    args = (corpus, server_spec, per_process_rate, repeat, trace_memory)
+    if processes == 1:
+        reports = [_worker(*args)]
+    else:
+        barrier = multiprocessing.Barrier(processes)
+        with multiprocessing.Pool(processes, _init_worker, (barrier,)) as pool:
+            reports = pool.starmap(_worker, [args] * processes)
+    report = ReplayReport()
+    for r in reports:
+        report.merge(r)
+    # Only the replay loops are timed, not process startup or server setup
+    report.started = min(r.started for r in reports)
+    report.finished = max(r.finished for r in reports)
+    report.elapsed = (
+        reports[0].elapsed if processes == 1 else report.finished - report.started
+    )
+    return report
+
+
+def _positive(type_: Callable[[str], T]) -> Callable[[str], T]:
+    def convert(value: str) -> T:
+        try:
+            converted = type_(value)
+        except ValueError:
+            converted = None
+        if converted is None or not converted > 0:  # Also rejects NaN
+            msg = f"must be a positive number (got '{value}')"
+            raise argparse.ArgumentTypeError(msg)
+        return converted
+
+    return convert
+
+
+def _server_spec(value: str) -> str:
+    try:
+        _parse_server_spec(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+    return value
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m pyjsonrpc2.replay",
+        description="Replay a recorded JSON-RPC traffic corpus.",
+    )
+    parser.add_argument("corpus", help="JSON lines file, one raw request per line")
+    parser.add_argument(
+        "--server",
+        dest="server_spec",
+        type=_server_spec,
+        metavar="MODULE:ATTR",
+        help="JsonRpcServer instance or factory (default: stub methods)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=_positive(float),
+        help="total calls per second (default: as fast as possible)",
+    )
+    parser.add_argument("--processes", type=_positive(int), default=1)
+    parser.add_argument(
+        "--repeat",
+        type=_positive(int),
+        default=1,
+        help="number of passes over the corpus",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="report memory growth using tracemalloc (slows calls down)",
+    )
+    args = parser.parse_args(argv)
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        parser.error("empty corpus")
+    print(  # noqa: T201
+        replay(
+            corpus,
+            server_spec=args.server_spec,
+            rate=args.rate,
+            processes=args.processes,
+            repeat=args.repeat,
+            trace_memory=args.trace_memory,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-__all__ = ["rpc_method", "JsonRpcServer", "JsonRpcError"]
+__all__ = ["rpc_method", "JsonRpcServer", "JsonRpcError", "RateLimiter"]
 
 import inspect
 import logging
-from typing import TYPE_CHECKING, Any, TypeVar, overload
+from typing import TYPE_CHECKING, Any, Protocol, TypeVar, overload
 
 from orjson import Fragment, dumps, loads
 
@@ -19,6 +19,10 @@ _ID = (str, int, float, type(None))
 _REQUEST_KEYS = frozenset(("jsonrpc", "method", "params", "id"))
 
 
+class RateLimiter(Protocol):
+    def acquire(self, method: str, context: Any = None) -> bool: ...  # pragma: no cover
+
+
 class JsonRpcError(Exception):
     def __init__(self, code: int, message: str, data: Any = None) -> None:
         super().__init__(f"[{code}] {message}" + ("" if data is None else f": {data}"))
@@ -39,6 +43,8 @@ class _Error:
     METHOD_NOT_FOUND = {"code": -32601, "message": "Method not found"}
     INVALID_PARAMS = {"code": -32602, "message": "Invalid params"}
     INTERNAL_ERROR = {"code": -32603, "message": "Internal error"}
+    # Preformatted: rejections must stay cheap under load
+    RATE_LIMITED = Fragment(b'{"code":-32099,"message":"Rate limit exceeded"}')
 
 
 def _respond(
@@ -86,9 +92,11 @@ class JsonRpcServer:
         methods: dict[str, Callable[..., Any]] | None = None,
         *,
         dumps_kwargs: dict[str, Any] | None = None,
+        rate_limiter: RateLimiter | None = None,
     ) -> None:
         self._methods = methods or {}
         self._dumps_kwargs = dumps_kwargs or {}
+        self._rate_limiter = rate_limiter
         self.add_object(self)
 
     def add_object(self, obj: Any, *, prefix: str = "") -> None:
@@ -105,7 +113,9 @@ class JsonRpcServer:
             raise ValueError(msg)
         self._methods[name] = method
 
-    def _run(self, request: dict[str, Any]) -> dict[str, Any] | None:  # noqa: C901, PLR0911, PLR0912
+    def _run(  # noqa: C901, PLR0911, PLR0912
+        self, request: dict[str, Any], context: Any = None
+    ) -> dict[str, Any] | None:
         # Validate "jsonrpc" entry
         try:
             if request["jsonrpc"] != "2.0":
@@ -165,6 +175,19 @@ class JsonRpcServer:
         except KeyError:
             return _respond(_Error.METHOD_NOT_FOUND, id=id)
 
+        if self._rate_limiter is not None:
+            try:
+                allowed = self._rate_limiter.acquire(method_name, context)
+            except Exception as e:
+                _LOGGER.exception(
+                    "RPC Error [id: %s] [method: '%s'] Rate limiter failure",
+                    "notification" if id is _SENTINEL else str(id),
+                    method_name,
+                )
+                return _respond(_Error.INTERNAL_ERROR, id=id, error=str(e))
+            if not allowed:
+                return _respond(_Error.RATE_LIMITED, id=id)
+
         # Call method and handle error
         try:
             try:
@@ -187,7 +210,7 @@ class JsonRpcServer:
         return _respond(result, id=id, error=False)
 
     def _process(
-        self, raw_request: bytes | bytearray | memoryview | str
+        self, raw_request: bytes | bytearray | memoryview | str, context: Any = None
     ) -> dict[str, Any] | list[Fragment] | None:
         try:
             request: dict[str, Any] | list[dict[str, Any]] = loads(raw_request)
@@ -199,9 +222,9 @@ class JsonRpcServer:
             return [
                 Fragment(self._encode(response))
                 for r in request
-                if (response := self._run(r))  # None (notification) check
+                if (response := self._run(r, context))  # None (notification) check
             ]
-        return self._run(request)
+        return self._run(request, context)
 
     @overload
     def _encode(self, response: None) -> None: ...  # pragma: no cover
@@ -225,5 +248,7 @@ class JsonRpcServer:
             _LOGGER.exception("RPC Error [id:%s] Unserializable response", str(id))
             return self._encode(_respond(_Error.INTERNAL_ERROR, id=id, error=str(e)))
 
-    def call(self, request: bytes | bytearray | memoryview | str) -> bytes | None:
-        return self._encode(self._process(request))
+    def call(
+        self, request: bytes | bytearray | memoryview | str, context: Any = None
+    ) -> bytes | None:
+        return self._encode(self._process(request, context))
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import unittest
+
+from pyjsonrpc2.ratelimit import TokenBucketLimiter
+from pyjsonrpc2.server import JsonRpcServer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TokenBucketLimiterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+
+    def test_burst_and_refill(self) -> None:
+        limiter = TokenBucketLimiter(1, 2, clock=self.clock)
+        self.assertTrue(limiter.acquire("foo", "alice"))
+        self.assertTrue(limiter.acquire("foo", "alice"))
+        self.assertFalse(limiter.acquire("foo", "alice"))
+        self.assertTrue(limiter.acquire("foo", "bob"))
+        self.clock.now = 1.0
+        self.assertTrue(limiter.acquire("foo", "alice"))
+        self.assertFalse(limiter.acquire("foo", "alice"))
+
+    def test_per_method_limit(self) -> None:
+        limiter = TokenBucketLimiter(
+            100, methods={"expensive": (1, 1)}, clock=self.clock
+        )
+        self.assertTrue(limiter.acquire("expensive", "alice"))
+        self.assertFalse(limiter.acquire("expensive", "alice"))
+        self.assertTrue(limiter.acquire("cheap", "alice"))
+        self.assertTrue(limiter.acquire("expensive", "bob"))
+
+    def test_per_client_limit(self) -> None:
+        limiter = TokenBucketLimiter(1, clients={"admin": (10, 10)}, clock=self.clock)
+        self.assertTrue(limiter.acquire("foo", "alice"))
+        self.assertFalse(limiter.acquire("foo", "alice"))
+        for _ in range(10):
+            self.assertTrue(limiter.acquire("foo", "admin"))
+        self.assertFalse(limiter.acquire("foo", "admin"))
+
+    def test_key(self) -> None:
+        limiter = TokenBucketLimiter(1, key=lambda ctx: ctx["user"], clock=self.clock)
+        self.assertTrue(limiter.acquire("foo", {"user": "alice", "ip": "1"}))
+        self.assertFalse(limiter.acquire("foo", {"user": "alice", "ip": "2"}))
+
+    def test_idle_eviction(self) -> None:
+        limiter = TokenBucketLimiter(
+            1, methods={"foo": (1, 1)}, idle_timeout=10, clock=self.clock
+        )
+        limiter.acquire("foo", "alice")
+        self.clock.now = 5.0
+        limiter.acquire("bar", "bob")
+        self.assertEqual(len(limiter), 3)
+        self.clock.now = 12.0
+        limiter.acquire("bar", "bob")
+        self.assertEqual(len(limiter), 1)
+
+    def test_no_eviction_before_refill(self) -> None:
+        limiter = TokenBucketLimiter(0.1, 10, idle_timeout=60, clock=self.clock)
+        for _ in range(10):
+            self.assertTrue(limiter.acquire("foo", "alice"))
+        self.clock.now = 61.0
+        limiter.acquire("foo", "bob")
+        self.assertEqual(len(limiter), 2)
+        self.assertEqual(sum(limiter.acquire("foo", "alice") for _ in range(10)), 6)
+        self.clock.now = 300.0
+        limiter.acquire("foo", "bob")
+        self.assertEqual(len(limiter), 1)
+
+    def test_slow_bucket_does_not_block_eviction(self) -> None:
+        limiter = TokenBucketLimiter(
+            10,
+            methods={"report": (1 / 3600, 1)},
+            clients={"trial": (0, 5)},
+            idle_timeout=10,
+            clock=self.clock,
+        )
+        limiter.acquire("report", "alice")
+        limiter.acquire("foo", "trial")
+        for i in range(1000):
+            self.clock.now = i / 10
+            limiter.acquire("foo", i)
+        # Only alice's "report" bucket, trial's quota and the last 100 clients remain
+        self.assertEqual(len(limiter), 2 + 100)
+        for _ in range(1000):
+            limiter.acquire("foo", "bob")
+        self.assertLessEqual(len(limiter._expiry), 2 * len(limiter) + 64)  # noqa: SLF001
+        # The partly used "report" bucket outlives the idle timeout
+        self.assertFalse(limiter.acquire("report", "alice"))
+
+    def test_invalid_limits(self) -> None:
+        for args, kwargs in (
+            ((-1,), {}),
+            ((1, 0.5), {}),
+            ((1,), {"idle_timeout": -1}),
+            ((1,), {"methods": {"foo": (-1, 1)}}),
+            ((1,), {"clients": {"alice": (1, 0)}}),
+        ):
+            with self.subTest(args=args, kwargs=kwargs):
+                self.assertRaises(ValueError, TokenBucketLimiter, *args, **kwargs)
+
+
+class RateLimitedServerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rpc = JsonRpcServer(
+            {"echo": lambda x: x},
+            rate_limiter=TokenBucketLimiter(1, 2, clock=FakeClock()),
+        )
+
+    def test_rejected(self) -> None:
+        request = '{"jsonrpc": "2.0", "method": "echo", "params": [1], "id": 1}'
+        for _ in range(2):
+            self.assertEqual(
+                json.loads(self.rpc.call(request, "alice")),  # type: ignore[arg-type]
+                {"jsonrpc": "2.0", "result": 1, "id": 1},
+            )
+        self.assertEqual(
+            json.loads(self.rpc.call(request, "alice")),  # type: ignore[arg-type]
+            {
+                "jsonrpc": "2.0",
+                "error": {"code": -32099, "message": "Rate limit exceeded"},
+                "id": 1,
+            },
+        )
+        self.assertIsNotNone(self.rpc.call(request, "bob"))
+
+    def test_batch(self) -> None:
+        response = self.rpc.call(
+            json.dumps(
+                [
+                    {"jsonrpc": "2.0", "method": "echo", "params": [i], "id": i}
+                    for i in range(3)
+                ]
+                + [{"jsonrpc": "2.0", "method": "echo", "params": [3]}]
+            ),
+            "alice",
+        )
+        self.assertEqual(
+            [r.get("error", {}).get("code") for r in json.loads(response)],  # type: ignore[arg-type]
+            [None, None, -32099],
+        )
+
+    def test_limiter_failure(self) -> None:
+        request = '{"jsonrpc": "2.0", "method": "echo", "params": [1], "id": 1}'
+        with self.assertLogs("pyjsonrpc2.server"):
+            response = self.rpc.call(f"[{request}, {request}]", {"user": "alice"})
+        self.assertEqual(
+            json.loads(response),  # type: ignore[arg-type]
+            [
+                {
+                    "jsonrpc": "2.0",
+                    "error": {
+                        "code": -32603,
+                        "message": "Internal error",
+                        "data": "unhashable type: 'dict'",
+                    },
+                    "id": 1,
+                }
+            ]
+            * 2,
+        )
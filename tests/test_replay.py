@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import io
+import multiprocessing
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+from pyjsonrpc2 import replay as replay_module
+from pyjsonrpc2.replay import ReplayReport, load_corpus, main, replay, stub_server
+from pyjsonrpc2.server import JsonRpcServer
+
+CORPUS = [
+    b'{"jsonrpc": "2.0", "method": "add", "params": [1, 2], "id": 1}',
+    b'[{"jsonrpc": "2.0", "method": "ping", "id": 2}, {"jsonrpc": "2.0", "method": "add"}]',
+    b'{"jsonrpc": "2.0", "method": "add", "params": [1], "id": 3}',
+    b'{"jsonrpc": "2.0", "method"',
+]
+
+
+def make_server() -> JsonRpcServer:
+    return JsonRpcServer({"add": lambda a, b: a + b})
+
+
+def broken_server() -> JsonRpcServer:
+    msg = "Broken factory"
+    raise RuntimeError(msg)
+
+
+class ReplayTest(unittest.TestCase):
+    def test_load_corpus(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "corpus.jsonl"
+            path.write_bytes(b"\n".join(CORPUS) + b"\n\n")
+            self.assertEqual(load_corpus(path), CORPUS)
+
+    def test_stub_server(self) -> None:
+        server = stub_server(CORPUS)
+        self.assertEqual(
+            server.call(CORPUS[1]), b'[{"jsonrpc":"2.0","id":2,"result":null}]'
+        )
+
+    def test_stub_replay(self) -> None:
+        report = replay(CORPUS, repeat=2)
+        self.assertEqual(report.calls, 8)
+        self.assertEqual(len(report.latencies), 8)
+        self.assertEqual(report.outcomes, {"ok": 6, -32700: 2})
+        self.assertIsNone(report.memory_growth)
+        self.assertLessEqual(report.percentile(50), report.percentile(100))
+
+    def test_server_spec(self) -> None:
+        report = replay(
+            CORPUS, server_spec="tests.test_replay:make_server", trace_memory=True
+        )
+        self.assertEqual(report.outcomes, {"ok": 1, -32601: 1, -32602: 1, -32700: 1})
+        self.assertIsNotNone(report.memory_growth)
+
+    def test_rate_and_processes(self) -> None:
+        report = replay(CORPUS, rate=400, processes=2, repeat=5)
+        self.assertEqual(report.calls, 40)
+        self.assertEqual(report.outcomes, {"ok": 30, -32700: 10})
+        self.assertGreaterEqual(report.elapsed, 19 / 200)
+        self.assertEqual(report.elapsed, report.finished - report.started)
+
+    def test_fixed_rate(self) -> None:
+        report = replay(CORPUS, rate=2000, repeat=20)
+        self.assertEqual(report.calls, 80)
+        self.assertEqual(report.outcomes, {"ok": 60, -32700: 20})
+        self.assertGreaterEqual(report.elapsed, 79 / 2000)
+        self.assertIn("outcomes:    ok=60, -32700=20", str(report))
+        self.assertNotIn("memory:", str(report))
+
+    def test_notifications(self) -> None:
+        report = replay(
+            [
+                b'{"jsonrpc": "2.0", "method": "ping"}',
+                b'[1, {"jsonrpc": "2.0", "method": "ping"}]',
+            ]
+        )
+        self.assertEqual(report.calls, 2)
+        self.assertEqual(report.outcomes, {-32600: 1})
+
+    def test_empty_report(self) -> None:
+        self.assertEqual(ReplayReport().percentile(99), 0.0)
+        self.assertEqual(ReplayReport().throughput, 0.0)
+
+    def test_worker_barrier(self) -> None:
+        self.addCleanup(replay_module._init_worker, None)  # noqa: SLF001
+        replay_module._init_worker(multiprocessing.Barrier(1))  # noqa: SLF001
+        report = replay_module._worker(CORPUS, None, None, 1, trace_memory=False)  # noqa: SLF001
+        self.assertEqual(report.calls, 4)
+
+        barrier = multiprocessing.Barrier(2)
+        replay_module._init_worker(barrier)  # noqa: SLF001
+        with self.assertRaises(RuntimeError):
+            replay_module._worker(  # noqa: SLF001
+                CORPUS, "tests.test_replay:broken_server", None, 1, trace_memory=False
+            )
+        self.assertTrue(barrier.broken)
+        with self.assertRaisesRegex(RuntimeError, "Another replay worker"):
+            replay_module._worker(CORPUS, None, None, 1, trace_memory=False)  # noqa: SLF001
+
+    def test_failing_workers(self) -> None:
+        with self.assertRaises(RuntimeError):
+            replay(CORPUS, server_spec="tests.test_replay:broken_server", processes=2)
+
+    def test_invalid_arguments(self) -> None:
+        for kwargs in (
+            {"processes": 0},
+            {"repeat": 0},
+            {"rate": 0},
+            {"rate": -1},
+            {"server_spec": "tests.test_replay"},
+        ):
+            with self.subTest(**kwargs):
+                self.assertRaises(ValueError, replay, CORPUS, **kwargs)
+        self.assertRaises(
+            TypeError, replay, CORPUS, server_spec="tests.test_replay:CORPUS"
+        )
+
+    def test_main(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "corpus.jsonl"
+            path.write_bytes(b"\n".join(CORPUS))
+            out = io.StringIO()
+            with redirect_stdout(out):
+                self.assertEqual(
+                    main(
+                        [
+                            str(path),
+                            "--trace-memory",
+                            "--server",
+                            "tests.test_replay:make_server",
+                            "--rate",
+                            "100000",
+                            "--repeat",
+                            "2",
+                        ]
+                    ),
+                    0,
+                )
+        self.assertIn("throughput:", out.getvalue())
+        self.assertIn("memory:", out.getvalue())
+
+    def test_main_invalid_arguments(self) -> None:
+        for args in (
+            ["--processes", "0"],
+            ["--repeat", "-1"],
+            ["--rate", "0"],
+            ["--rate", "nan"],
+            ["--rate", "fast"],
+            ["--repeat", "twice"],
+            ["--server", "tests.test_replay"],
+        ):
+            with self.subTest(args=args), redirect_stderr(io.StringIO()):
+                self.assertRaises(SystemExit, main, ["corpus.jsonl", *args])
+
+    def test_main_empty_corpus(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "corpus.jsonl"
+            path.write_bytes(b"\n\n")
+            with redirect_stderr(io.StringIO()) as err:
+                self.assertRaises(SystemExit, main, [str(path)])
+        self.assertIn("empty corpus", err.getvalue())